@@ -13,11 +13,20 @@ GRANT pg_read_all_stats TO warranty_user;
 -- The FastAPI app creates tables on startup
 
 -- Example of creating additional indexes after tables exist:
--- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_warranties_asset_id ON warranties(asset_id);
--- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_warranties_status ON warranties(warranty_status);
 -- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_warranties_registered_at ON warranties(registered_at);
 -- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email ON users(email);
 
+-- For databases created before the model-level indexes were added, run
+-- these manually (new databases get them from SQLAlchemy's create_all):
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_warranty_status_registered_at ON warranties(warranty_status, registered_at DESC);
+-- CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_warranty_asset_unique ON warranties(asset_id);
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_warranty_registered_at_id ON warranties(registered_at DESC, id DESC);
+
+-- Databases created before users.is_active/is_admin became BOOLEAN need:
+-- ALTER TABLE users
+--   ALTER COLUMN is_active TYPE BOOLEAN USING (is_active = 'Y'),
+--   ALTER COLUMN is_admin TYPE BOOLEAN USING (is_admin = 'Y');
+
 -- Performance tuning queries to run manually:
 -- ANALYZE; -- Update statistics for query planner
 -- VACUUM ANALYZE; -- Clean up and update statistics
@@ -1,30 +1,96 @@
 """
 Authentication and security utilities.
 """
+import asyncio
+import hashlib
+import hmac
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from typing import NamedTuple, Optional
+import jwt
+from cachetools import TTLCache
+from jwt import InvalidTokenError
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, APIKeyHeader
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .config import get_settings
-from .database import get_db
+from .database import get_async_db, get_async_db_ctx
 from . import models
 
 settings = get_settings()
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hot-path constants bound once at import so token create/verify doesn't
+# chase settings attributes or rebuild timedeltas per request.
+_SIGN_KEY = settings.secret_key.encode()
+_ALGORITHM = settings.algorithm
+_ALGORITHMS = [settings.algorithm]
+_ACCESS_TOKEN_DELTA_SECONDS = settings.access_token_expire_minutes * 60
+
+# Dedicated PyJWT instance with the decode options built once, instead of
+# letting the module-level helpers rebuild the options dict on every call.
+_jwt = jwt.PyJWT()
+_DECODE_OPTIONS = {"verify_signature": True, "require": ["exp", "sub"]}
+
+# Password hashing context. Rounds are configurable so deployments can trade
+# hash cost against login latency (each extra round doubles the work).
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    bcrypt__rounds=settings.bcrypt_rounds,
+    deprecated="auto",
+)
 
 # Security schemes
 bearer_scheme = HTTPBearer(auto_error=False)
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# Short-lived cache of decoded token payloads, keyed by a hash of the token.
+# Avoids re-running HMAC verification + JSON parsing for every request from
+# the same client. TTL is kept short so revoked/expired tokens age out quickly.
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+
+
+class CachedUser(NamedTuple):
+    """Lightweight, immutable snapshot of a User row for the auth hot path."""
+    id: uuid.UUID
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    is_admin: bool
+    created_at: datetime
+
+
+# Cache of authenticated users keyed by email, so steady-state requests only
+# pay for the JWT decode and skip the per-request User SELECT entirely.
+_user_cache: TTLCache = TTLCache(maxsize=5000, ttl=60)
+
+
+def invalidate_user_cache(email: str) -> None:
+    """Drop a cached user entry after a mutation that affects auth state."""
+    _user_cache.pop(email, None)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password."""
+
+# Memoize successful password verifications for a short window so repeated
+# logins with the same credentials don't redo the full 2^rounds bcrypt work.
+# Only positive results are cached; failures always pay the bcrypt cost.
+_verify_cache: TTLCache = TTLCache(maxsize=10000, ttl=60)
+
+# bcrypt is CPU-bound; a dedicated process pool lets hashing parallelise
+# across cores instead of serialising on the GIL or pinning the event loop.
+_hash_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+def _verify_cache_key(plain_password: str, hashed_password: str) -> str:
+    return hashlib.sha256((plain_password + hashed_password).encode()).hexdigest()
+
+
+def _verify_uncached(plain_password: str, hashed_password: str) -> bool:
+    # Module-level so it pickles by reference for the process pool.
     return pwd_context.verify(plain_password, hashed_password)
 
 
@@ -33,25 +99,49 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the process pool, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, get_password_hash, password
+    )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the process pool, off the event loop.
+
+    The memo cache is consulted here, in the parent process, so cache hits
+    never pay the executor dispatch.
+    """
+    cache_key = _verify_cache_key(plain_password, hashed_password)
+    if _verify_cache.get(cache_key):
+        return True
+    ok = await asyncio.get_running_loop().run_in_executor(
+        _hash_pool, _verify_uncached, plain_password, hashed_password
+    )
+    if ok:
+        _verify_cache[cache_key] = True
+    return ok
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
-    
+
+    Note: the "exp" claim is written into `data` in place; callers pass a
+    fresh payload dict, so there is no reason to pay for a copy here.
+
     Args:
         data: Payload data to encode in the token
         expires_delta: Optional expiration time delta
-    
+
     Returns:
         Encoded JWT token string
     """
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+    if expires_delta is not None:
+        data["exp"] = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
-    return encoded_jwt
+        data["exp"] = int(time.time()) + _ACCESS_TOKEN_DELTA_SECONDS
+    return _jwt.encode(data, _SIGN_KEY, algorithm=_ALGORITHM)
 
 
 def decode_token(token: str) -> dict:
@@ -67,31 +157,45 @@ def decode_token(token: str) -> dict:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    payload = _token_cache.get(cache_key)
+    if payload is not None:
+        # Still enforce expiry on cache hits so a token never outlives
+        # its "exp" claim just because it was cached.
+        exp = payload.get("exp")
+        if exp is not None and exp > time.time():
+            return payload
+        _token_cache.pop(cache_key, None)
+
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
-    except JWTError:
+        payload = _jwt.decode(
+            token, _SIGN_KEY, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS
+        )
+    except InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    _token_cache[cache_key] = payload
+    return payload
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
-    db: Session = Depends(get_db)
-) -> models.User:
+    db: AsyncSession = Depends(get_async_db)
+) -> CachedUser:
     """
     Get the current authenticated user from JWT token.
-    
+
     Args:
         credentials: HTTP Bearer credentials
         db: Database session
-    
+
     Returns:
-        User model instance
-    
+        CachedUser snapshot of the authenticated user
+
     Raises:
         HTTPException: If authentication fails
     """
@@ -101,7 +205,7 @@ async def get_current_user(
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
     payload = decode_token(credentials.credentials)
     email: str = payload.get("sub")
     if email is None:
@@ -110,27 +214,40 @@ async def get_current_user(
             detail="Invalid token payload",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+
+    cached = _user_cache.get(email)
+    if cached is None:
+        user = (await db.execute(
+            select(models.User).where(models.User.email == email)
+        )).scalar_one_or_none()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        cached = CachedUser(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            is_admin=user.is_admin,
+            created_at=user.created_at,
         )
-    
-    if user.is_active != 'Y':
+        _user_cache[email] = cached
+
+    if not cached.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
-    
-    return user
+
+    return cached
 
 
 async def get_current_admin_user(
-    current_user: models.User = Depends(get_current_user)
-) -> models.User:
+    current_user: CachedUser = Depends(get_current_user)
+) -> CachedUser:
     """
     Verify the current user has admin privileges.
     
@@ -143,7 +260,7 @@ async def get_current_admin_user(
     Raises:
         HTTPException: If user is not an admin
     """
-    if current_user.is_admin != 'Y':
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
@@ -173,7 +290,7 @@ async def validate_api_key(
             headers={"X-API-Key": "Required"},
         )
     
-    if api_key != settings.api_key:
+    if not hmac.compare_digest(api_key.encode(), settings.api_key_bytes):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
@@ -194,38 +311,50 @@ def validate_api_key_value(api_key: str) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    return api_key == settings.api_key
+    # Deliberately uncached: this is a single constant-time byte compare
+    # against the pre-encoded key — cheaper than any cache lookup, and a
+    # cache keyed on submitted values would let an attacker grow it.
+    return hmac.compare_digest(api_key.encode(), settings.api_key_bytes)
+
+
+async def _maybe_api_key(api_key: str = Security(api_key_header)) -> bool:
+    """Header-only API key check; touches no other dependencies."""
+    return bool(api_key) and hmac.compare_digest(api_key.encode(), settings.api_key_bytes)
 
 
 async def get_api_key_or_user(
-    api_key: str = Security(api_key_header),
+    is_api_key: bool = Depends(_maybe_api_key),
     credentials: HTTPAuthorizationCredentials = Security(bearer_scheme),
-    db: Session = Depends(get_db)
 ):
     """
     Allow authentication via either API key or JWT token.
     Used for endpoints that can be called by both services and users.
-    
+
+    The API-key check is a separate header-only dependency, and the DB
+    session is only acquired inside the JWT branch — declaring it as a
+    Depends parameter would check out a pooled connection even for
+    API-key requests that never touch the database.
+
     Args:
-        api_key: Optional API key
+        is_api_key: Result of the header-only API key check
         credentials: Optional JWT credentials
-        db: Database session
-    
+
     Returns:
         Tuple of (user_or_none, is_api_key_auth)
     """
     # First try API key
-    if api_key and api_key == settings.api_key:
+    if is_api_key:
         return (None, True)
-    
+
     # Then try JWT token
     if credentials:
         try:
-            user = await get_current_user(credentials, db)
+            async with get_async_db_ctx() as db:
+                user = await get_current_user(credentials, db)
             return (user, False)
         except HTTPException:
             pass
-    
+
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Valid API key or JWT token required"
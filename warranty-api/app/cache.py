@@ -0,0 +1,40 @@
+"""
+Shared Redis client and cross-route cache helpers.
+
+Lives outside the route modules so the API routes can invalidate the web
+dashboard cache without importing routes.web.
+"""
+import logging
+
+import redis.asyncio as aioredis
+
+from .config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Redis-backed shared state: sessions, cached dashboard pages, and the
+# dashboard version counter, shared across workers.
+redis_client = aioredis.from_url(settings.redis_url, decode_responses=True)
+
+DASHBOARD_CACHE_TTL = 10  # seconds; absorbs refresh/pagination bursts
+
+
+async def dashboard_cache_key(user_id, page: int) -> str:
+    """Versioned cache key: bumping dash:ver orphans every cached page."""
+    version = await redis_client.get("dash:ver") or "0"
+    return f"dash:{version}:{user_id}:{page}"
+
+
+async def invalidate_dashboard_cache() -> None:
+    """Invalidate all cached dashboard pages after a warranty changes.
+
+    Bumps the version counter instead of scanning for dash:* keys; stale
+    entries simply expire via their TTL. Best-effort by design: callers
+    run this after commit, and a Redis outage must not turn a committed
+    write into a 500 — the short TTL self-heals any staleness.
+    """
+    try:
+        await redis_client.incr("dash:ver")
+    except Exception as e:
+        logger.warning(f"Dashboard cache invalidation failed: {e}")
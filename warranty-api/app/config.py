@@ -2,15 +2,24 @@
 Configuration settings for the Warranty Register API.
 Uses pydantic-settings for environment variable management.
 """
-from pydantic_settings import BaseSettings
-from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import cached_property, lru_cache
 
 
 class Settings(BaseSettings):
-    """Application settings loaded from environment variables."""
-    
+    """Application settings loaded from environment variables.
+
+    Frozen after construction: handlers bind derived constants (token
+    deltas, encoded keys) at module scope and rely on them never changing.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, frozen=True)
+
     # Database settings
     database_url: str = "postgresql://warranty_user:warranty_pass@db:5432/warranty_db"
+
+    # Redis (web sessions)
+    redis_url: str = "redis://redis:6379/0"
     
     # JWT Settings for API authentication
     secret_key: str = "your-super-secret-key-change-in-production-minimum-32-chars"
@@ -25,13 +34,15 @@ class Settings(BaseSettings):
     # Security
     api_key: str = "warranty-api-key-change-this"
     allowed_origins: str = "*"
+    bcrypt_rounds: int = 10
     
     # App settings
     debug: bool = False
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+
+    @cached_property
+    def api_key_bytes(self) -> bytes:
+        """API key pre-encoded once for constant-time comparisons."""
+        return self.api_key.encode()
 
 
 @lru_cache()
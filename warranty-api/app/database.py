@@ -1,36 +1,55 @@
 """
 Database connection and session management.
 """
-from sqlalchemy import create_engine
+from contextlib import asynccontextmanager
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from .config import get_settings
 
 settings = get_settings()
 
-# Create database engine with connection pooling
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,  # Enable connection health checks
-    pool_size=10,  # Connection pool size
-    max_overflow=20,  # Max connections beyond pool_size
+# Async engine (asyncpg driver) with connection pooling — every code path,
+# API and web alike, awaits its DB waits on the event loop instead of
+# blocking a worker thread per request. pool_pre_ping is off: it costs a
+# SELECT 1 round-trip on every checkout, and pool_recycle already bounds
+# how stale a connection can get. For deployments that put pgbouncer
+# (transaction pooling) in front of Postgres, switch to NullPool and let
+# pgbouncer own the connections.
+async_database_url = settings.database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+async_engine = create_async_engine(
+    async_database_url,
+    pool_size=20,  # Connection pool size
+    max_overflow=40,  # Max connections beyond pool_size
     pool_recycle=3600,  # Recycle connections after 1 hour
 )
 
 # Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # Base class for ORM models
 Base = declarative_base()
 
 
-def get_db():
+async def get_async_db():
+    """
+    Async database session dependency.
+    Yields an AsyncSession and ensures it's closed after use.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def get_async_db_ctx():
     """
-    Database session dependency.
-    Yields a database session and ensures it's closed after use.
+    Async database session as a context manager.
+
+    For code that needs a session conditionally, outside FastAPI's
+    dependency graph — a Depends(get_async_db) parameter checks out a
+    pooled connection whether or not the handler ends up using it.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
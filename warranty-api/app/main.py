@@ -5,12 +5,12 @@ A FastAPI application for registering and managing device warranties.
 """
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse
 from contextlib import asynccontextmanager
 import logging
 
 from .config import get_settings
-from .database import engine, Base
+from .database import async_engine, Base
 from .routes import auth, warranty, web
 
 # Configure logging
@@ -33,36 +33,55 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Warranty Register API...")
     
     # Create database tables
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created/verified")
     
-    # Create initial admin user if none exists
-    from .database import SessionLocal
+    # Create initial admin and system users if missing
+    from sqlalchemy import select
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from .database import AsyncSessionLocal
     from . import models
     from .auth import get_password_hash
-    
-    db = SessionLocal()
-    try:
-        admin_exists = db.query(models.User).filter(
-            models.User.is_admin == 'Y'
-        ).first()
-        
-        if not admin_exists:
-            # Create default admin user
-            admin_user = models.User(
-                email="admin@warranty.local",
-                hashed_password=get_password_hash("Admin@123"),
-                full_name="System Administrator",
-                is_active='Y',
-                is_admin='Y'
+
+    # Always defined, even if bootstrap fails below — handlers that read it
+    # can then distinguish "not bootstrapped" from a programming error.
+    app.state.system_user_id = None
+
+    async with AsyncSessionLocal() as db:
+        try:
+            # One idempotent statement: insert both bootstrap users, skipping
+            # whichever already exists, instead of SELECT-then-INSERT per user.
+            await db.execute(
+                pg_insert(models.User).values([
+                    {
+                        "email": "admin@warranty.local",
+                        "hashed_password": get_password_hash("Admin@123"),
+                        "full_name": "System Administrator",
+                        "is_active": True,
+                        "is_admin": True,
+                    },
+                    {
+                        "email": "system@warranty-api.local",
+                        "hashed_password": get_password_hash("system-password-not-for-login"),
+                        "full_name": "System User",
+                        "is_active": True,
+                        "is_admin": False,
+                    },
+                ]).on_conflict_do_nothing(index_elements=["email"])
+            )
+            await db.commit()
+
+            # Cache the system user id so the registration hot path never has
+            # to look it up.
+            app.state.system_user_id = await db.scalar(
+                select(models.User.id).where(
+                    models.User.email == "system@warranty-api.local"
+                )
             )
-            db.add(admin_user)
-            db.commit()
-            logger.info("Default admin user created: admin@warranty.local / Admin@123")
-    except Exception as e:
-        logger.error(f"Error creating default admin: {e}")
-    finally:
-        db.close()
+            logger.info("Default admin and system users verified")
+        except Exception as e:
+            logger.error(f"Error creating default users: {e}")
     
     yield
     
@@ -76,6 +95,7 @@ app = FastAPI(
     version=settings.api_version,
     description=settings.api_description,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json"
@@ -1,7 +1,7 @@
 """
 SQLAlchemy ORM models for the Warranty Register database.
 """
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Boolean, Column, String, DateTime, Float, ForeignKey, Index, Text, text, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -27,8 +27,8 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=True)
-    is_active = Column(String(1), default='Y')
-    is_admin = Column(String(1), default='N')
+    is_active = Column(Boolean, default=True, nullable=False)
+    is_admin = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -42,11 +42,30 @@ class User(Base):
 class Warranty(Base):
     """Warranty registration model for assets."""
     __tablename__ = "warranties"
-    
+    __table_args__ = (
+        # Serves the status-filtered, newest-first listing straight from the
+        # index, without a heap sort.
+        Index(
+            "ix_warranty_status_registered_at",
+            "warranty_status",
+            text("registered_at DESC"),
+        ),
+        # One warranty per asset; also makes the duplicate check on
+        # registration a single B-tree probe.
+        Index("ix_warranty_asset_unique", "asset_id", unique=True),
+        # Unfiltered newest-first listing (web dashboard); id as a
+        # tiebreaker keeps the order total for keyset pagination.
+        Index(
+            "ix_warranty_registered_at_id",
+            text("registered_at DESC"),
+            text("id DESC"),
+        ),
+    )
+
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    
+
     # Asset details from Next.js app
-    asset_id = Column(String(255), nullable=False, index=True)
+    asset_id = Column(String(255), nullable=False)
     asset_name = Column(String(255), nullable=False)
     category = Column(String(255), nullable=True)
     department = Column(String(255), nullable=True)
@@ -2,23 +2,29 @@
 API routes for user authentication.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from ..database import get_db
+from ..database import get_async_db
 from .. import models, schemas
 from ..auth import (
-    get_password_hash,
-    verify_password,
+    CachedUser,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     get_current_user,
-    get_current_admin_user
+    get_current_admin_user,
+    invalidate_user_cache
 )
 from ..config import get_settings
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 settings = get_settings()
 
+# Token lifetime is fixed for the process; build the timedelta once.
+_ACCESS_TOKEN_DELTA = timedelta(minutes=settings.access_token_expire_minutes)
+
 
 @router.post(
     "/register",
@@ -29,7 +35,7 @@ settings = get_settings()
 )
 async def register_user(
     user_data: schemas.UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new user account.
@@ -45,35 +51,35 @@ async def register_user(
         HTTPException: If email already exists
     """
     # Check if user exists
-    existing_user = db.query(models.User).filter(
-        models.User.email == user_data.email
-    ).first()
-    
-    if existing_user:
+    existing_user = (await db.execute(
+        select(models.User.id).where(models.User.email == user_data.email)
+    )).scalar_one_or_none()
+
+    if existing_user is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     new_user = models.User(
         email=user_data.email,
         hashed_password=hashed_password,
         full_name=user_data.full_name,
-        is_active='Y',
-        is_admin='N'
+        is_active=True,
+        is_admin=False
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
+    await db.commit()
+    await db.refresh(new_user)
+    invalidate_user_cache(new_user.email)
+
     # Generate access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
         data={"sub": new_user.email, "user_id": str(new_user.id)},
-        expires_delta=access_token_expires
+        expires_delta=_ACCESS_TOKEN_DELTA
     )
     
     return schemas.UserWithToken(
@@ -91,7 +97,7 @@ async def register_user(
 )
 async def login(
     login_data: schemas.UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Authenticate user and return access token.
@@ -107,28 +113,31 @@ async def login(
         HTTPException: If credentials are invalid
     """
     # Find user by email
-    user = db.query(models.User).filter(
-        models.User.email == login_data.email
-    ).first()
-    
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    user = (await db.execute(
+        select(models.User).where(models.User.email == login_data.email)
+    )).scalar_one_or_none()
+    
+    # bcrypt verification is CPU-bound; run it in the hash process pool so
+    # it doesn't block the event loop and parallelises across cores.
+    if not user or not await verify_password_async(
+        login_data.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    if user.is_active != 'Y':
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
     
     # Generate access token
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
         data={"sub": user.email, "user_id": str(user.id)},
-        expires_delta=access_token_expires
+        expires_delta=_ACCESS_TOKEN_DELTA
     )
     
     return schemas.UserWithToken(
@@ -145,7 +154,7 @@ async def login(
     description="Get the currently authenticated user's profile"
 )
 async def get_me(
-    current_user: models.User = Depends(get_current_user)
+    current_user: CachedUser = Depends(get_current_user)
 ):
     """
     Get current authenticated user's profile.
@@ -168,8 +177,8 @@ async def get_me(
 )
 async def create_admin(
     user_data: schemas.UserCreate,
-    current_admin: models.User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_admin: CachedUser = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new admin user.
@@ -183,28 +192,29 @@ async def create_admin(
         Created admin user
     """
     # Check if user exists
-    existing_user = db.query(models.User).filter(
-        models.User.email == user_data.email
-    ).first()
-    
-    if existing_user:
+    existing_user = (await db.execute(
+        select(models.User.id).where(models.User.email == user_data.email)
+    )).scalar_one_or_none()
+
+    if existing_user is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create new admin user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     new_admin = models.User(
         email=user_data.email,
         hashed_password=hashed_password,
         full_name=user_data.full_name,
-        is_active='Y',
-        is_admin='Y'
+        is_active=True,
+        is_admin=True
     )
     
     db.add(new_admin)
-    db.commit()
-    db.refresh(new_admin)
-    
+    await db.commit()
+    await db.refresh(new_admin)
+    invalidate_user_cache(new_admin.email)
+
     return new_admin
@@ -1,24 +1,58 @@
 """
 API routes for warranty registration and management.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime, timedelta
-import math
+from uuid import UUID
 
-from ..database import get_db
+from ..cache import invalidate_dashboard_cache
+from ..database import get_async_db
 from .. import models, schemas
 from ..auth import (
-    get_current_user, 
-    get_current_admin_user, 
+    CachedUser,
+    get_current_user,
+    get_current_admin_user,
     validate_api_key,
     get_api_key_or_user
 )
 
 router = APIRouter(prefix="/warranties", tags=["warranties"])
 
+# Precomputed value -> member map so status validation is a dict lookup
+# rather than an exception-driven enum construction per request.
+_STATUS_MAP = {s.value: s for s in models.WarrantyStatus}
+
+
+def _serialize_warranty(w: models.Warranty) -> dict:
+    """Build a WarrantyResponse-shaped dict for read-only list output.
+
+    The list endpoint returns rows verbatim, so skipping the Pydantic
+    validator stack here cuts most of the serialization cost; orjson
+    handles UUID and datetime values natively.
+    """
+    return {
+        "id": w.id,
+        "asset_id": w.asset_id,
+        "asset_name": w.asset_name,
+        "category": w.category,
+        "department": w.department,
+        "cost": w.cost,
+        "date_purchased": w.date_purchased,
+        "warranty_status": w.warranty_status.value,
+        "warranty_start_date": w.warranty_start_date,
+        "warranty_end_date": w.warranty_end_date,
+        "warranty_notes": w.warranty_notes,
+        "registered_by": w.registered_by,
+        "registered_by_email": w.registered_by_email,
+        "registered_at": w.registered_at,
+        "created_at": w.created_at,
+    }
+
 
 @router.post(
     "/register",
@@ -27,69 +61,51 @@ router = APIRouter(prefix="/warranties", tags=["warranties"])
     description="Register a new warranty for an asset. Can be called with API key from Next.js app."
 )
 async def register_warranty(
+    request: Request,
     warranty_data: schemas.WarrantyRegisterRequest,
     auth_result: tuple = Depends(get_api_key_or_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new warranty for an asset.
-    
+
     This endpoint can be called by:
     - The Next.js app using an API key (X-API-Key header)
     - Authenticated users using JWT token
-    
+
     Args:
+        request: Request (carries the cached system user id on app.state)
         warranty_data: Warranty registration data
         auth_result: Authentication result (user or API key)
         db: Database session
-    
+
     Returns:
         WarrantyRegistrationResult with success status and warranty ID
     """
     user, is_api_key = auth_result
-    
-    # Check if warranty already exists for this asset
-    existing = db.query(models.Warranty).filter(
-        models.Warranty.asset_id == warranty_data.asset_id
-    ).first()
-    
-    if existing:
-        return schemas.WarrantyRegistrationResult(
-            success=False,
-            message="Warranty already registered for this asset",
-            warranty_id=existing.id,
-            warranty_status=existing.warranty_status.value
-        )
-    
-    # For API key auth, we need a system user or create one
+
+    # For API key auth, attribute the registration to the system user
+    # created at startup; its id is cached on app.state so this path does
+    # no user-table reads at all.
     if is_api_key:
-        # Find or create a system user for API registrations
-        system_user = db.query(models.User).filter(
-            models.User.email == "system@warranty-api.local"
-        ).first()
-        
-        if not system_user:
-            from ..auth import get_password_hash
-            system_user = models.User(
-                email="system@warranty-api.local",
-                hashed_password=get_password_hash("system-password-not-for-login"),
-                full_name="System User",
-                is_active='Y',
-                is_admin='N'
+        registered_by_id = request.app.state.system_user_id
+        if registered_by_id is None:
+            # Startup bootstrap failed (logged there); refuse cleanly
+            # instead of inserting with a null owner.
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="System user unavailable; registration temporarily disabled"
             )
-            db.add(system_user)
-            db.commit()
-            db.refresh(system_user)
-        
-        registered_by_id = system_user.id
     else:
         registered_by_id = user.id
-    
+
     # Calculate warranty end date (1 year from registration)
     warranty_end = datetime.utcnow() + timedelta(days=365)
-    
-    # Create warranty record
-    warranty = models.Warranty(
+
+    # One atomic round-trip: insert, or do nothing if the asset already has
+    # a warranty (enforced by the unique index on asset_id). No SELECT-then-
+    # INSERT race window.
+    stmt = pg_insert(models.Warranty).values(
         asset_id=warranty_data.asset_id,
         asset_name=warranty_data.asset_name,
         category=warranty_data.category,
@@ -102,17 +118,34 @@ async def register_warranty(
         warranty_notes=warranty_data.warranty_notes,
         registered_by=registered_by_id,
         registered_by_email=warranty_data.registered_by_email
-    )
-    
-    db.add(warranty)
-    db.commit()
-    db.refresh(warranty)
-    
+    ).on_conflict_do_nothing(
+        index_elements=["asset_id"]
+    ).returning(models.Warranty.id)
+
+    warranty_id = (await db.execute(stmt)).scalar_one_or_none()
+
+    if warranty_id is None:
+        # Conflict: look up the existing warranty for the duplicate response.
+        await db.rollback()
+        existing = (await db.execute(
+            select(models.Warranty.id, models.Warranty.warranty_status)
+            .where(models.Warranty.asset_id == warranty_data.asset_id)
+        )).first()
+        return schemas.WarrantyRegistrationResult(
+            success=False,
+            message="Warranty already registered for this asset",
+            warranty_id=existing.id if existing else None,
+            warranty_status=existing.warranty_status.value if existing else None
+        )
+
+    await db.commit()
+    await invalidate_dashboard_cache()
+
     return schemas.WarrantyRegistrationResult(
         success=True,
         message="Warranty registered successfully",
-        warranty_id=warranty.id,
-        warranty_status=warranty.warranty_status.value
+        warranty_id=warranty_id,
+        warranty_status=models.WarrantyStatus.REGISTERED.value
     )
 
 
@@ -125,7 +158,7 @@ async def register_warranty(
 async def check_warranty(
     asset_id: str,
     api_key_valid: bool = Depends(validate_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Check warranty status for a specific asset.
@@ -137,9 +170,9 @@ async def check_warranty(
     Returns:
         Warranty details if found, null otherwise
     """
-    warranty = db.query(models.Warranty).filter(
-        models.Warranty.asset_id == asset_id
-    ).first()
+    warranty = (await db.execute(
+        select(models.Warranty).where(models.Warranty.asset_id == asset_id)
+    )).scalar_one_or_none()
     
     return warranty
 
@@ -151,57 +184,98 @@ async def check_warranty(
     description="Get a paginated list of all registered warranties (admin only)"
 )
 async def list_warranties(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (offset pagination)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     status_filter: Optional[str] = Query(None, description="Filter by warranty status"),
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[datetime] = Query(
+        None,
+        description="Keyset cursor: return warranties registered before this timestamp"
+    ),
+    cursor_id: Optional[UUID] = Query(
+        None,
+        description="Keyset cursor tiebreaker: id of the last row of the previous page"
+    ),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all registered warranties with pagination.
-    
+
+    Prefers keyset pagination: pass `next_cursor` and `next_cursor_id`
+    from the previous response to fetch the next page without an OFFSET
+    scan or a COUNT query. Offset pagination via `page` remains
+    supported; the total is only computed on its first page.
+
     Args:
-        page: Page number (1-indexed)
+        page: Page number (1-indexed, ignored when cursor is given)
         page_size: Number of items per page
         status_filter: Optional status filter
+        cursor: Optional keyset cursor (registered_at upper bound)
+        cursor_id: Optional id tiebreaker accompanying `cursor`
         current_user: Authenticated user
         db: Database session
-    
+
     Returns:
         Paginated list of warranties
     """
-    query = db.query(models.Warranty)
-    
+    query = select(models.Warranty)
+
     # Apply status filter if provided
     if status_filter:
-        try:
-            status_enum = models.WarrantyStatus(status_filter)
-            query = query.filter(models.Warranty.warranty_status == status_enum)
-        except ValueError:
+        status_enum = _STATUS_MAP.get(status_filter)
+        if status_enum is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid status filter: {status_filter}"
             )
-    
-    # Get total count
-    total = query.count()
-    
-    # Calculate pagination
-    total_pages = math.ceil(total / page_size) if total > 0 else 1
-    offset = (page - 1) * page_size
-    
-    # Get paginated results
-    warranties = query.order_by(
-        models.Warranty.registered_at.desc()
-    ).offset(offset).limit(page_size).all()
-    
-    return schemas.WarrantyListResponse(
-        warranties=warranties,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+        query = query.where(models.Warranty.warranty_status == status_enum)
+
+    total = None
+    total_pages = None
+
+    if cursor is not None:
+        # Keyset path: seek directly to rows after the cursor position.
+        # The compound comparison keeps rows that share the cursor's
+        # timestamp from being skipped at page boundaries and matches the
+        # (registered_at DESC, id) index.
+        if cursor_id is not None:
+            query = query.where(
+                tuple_(models.Warranty.registered_at, models.Warranty.id)
+                < tuple_(cursor, cursor_id)
+            )
+        else:
+            query = query.where(models.Warranty.registered_at < cursor)
+    else:
+        # Offset path kept for first-page/bookmarked requests; only that
+        # first page pays for the COUNT.
+        if page == 1:
+            total = await db.scalar(
+                select(func.count()).select_from(query.subquery())
+            )
+            total_pages = (total + page_size - 1) // page_size if total else 1
+        query = query.offset((page - 1) * page_size)
+
+    # Fetch one extra row to detect whether another page exists.
+    rows = (await db.execute(
+        query.order_by(
+            models.Warranty.registered_at.desc(),
+            models.Warranty.id.desc(),
+        ).limit(page_size + 1)
+    )).scalars().all()
+
+    has_more = len(rows) > page_size
+    warranties = rows[:page_size]
+
+    return ORJSONResponse({
+        "warranties": [_serialize_warranty(w) for w in warranties],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages,
+        "has_more": has_more,
+        "next_cursor": warranties[-1].registered_at if has_more else None,
+        "next_cursor_id": warranties[-1].id if has_more else None,
+    })
 
 
 @router.get(
@@ -212,8 +286,8 @@ async def list_warranties(
 )
 async def get_warranty(
     warranty_id: str,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get details of a specific warranty.
@@ -229,9 +303,9 @@ async def get_warranty(
     Raises:
         HTTPException: If warranty not found
     """
-    warranty = db.query(models.Warranty).filter(
-        models.Warranty.id == warranty_id
-    ).first()
+    warranty = (await db.execute(
+        select(models.Warranty).where(models.Warranty.id == warranty_id)
+    )).scalar_one_or_none()
     
     if not warranty:
         raise HTTPException(
@@ -251,8 +325,8 @@ async def get_warranty(
 async def update_warranty_status(
     warranty_id: str,
     new_status: str,
-    current_user: models.User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: CachedUser = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update warranty status.
@@ -266,9 +340,9 @@ async def update_warranty_status(
     Returns:
         Updated warranty details
     """
-    warranty = db.query(models.Warranty).filter(
-        models.Warranty.id == warranty_id
-    ).first()
+    warranty = (await db.execute(
+        select(models.Warranty).where(models.Warranty.id == warranty_id)
+    )).scalar_one_or_none()
     
     if not warranty:
         raise HTTPException(
@@ -276,14 +350,15 @@ async def update_warranty_status(
             detail="Warranty not found"
         )
     
-    try:
-        status_enum = models.WarrantyStatus(new_status)
-        warranty.warranty_status = status_enum
-        db.commit()
-        db.refresh(warranty)
-        return warranty
-    except ValueError:
+    status_enum = _STATUS_MAP.get(new_status)
+    if status_enum is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid status: {new_status}"
         )
+
+    warranty.warranty_status = status_enum
+    await db.commit()
+    await invalidate_dashboard_cache()
+    await db.refresh(warranty)
+    return warranty
@@ -2,44 +2,219 @@
 Web interface routes for the Warranty Register app.
 Provides a simple HTML interface for viewing registered warranties.
 """
+import json
+import os
+import uuid
+from dataclasses import dataclass, fields
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException, Request, Form, Response
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 from typing import Optional
-import math
 
-from ..database import get_db
+from ..cache import (
+    DASHBOARD_CACHE_TTL,
+    dashboard_cache_key,
+    invalidate_dashboard_cache,
+    redis_client,
+)
+from ..config import get_settings
+from ..database import get_async_db
 from .. import models
-from ..auth import verify_password, create_access_token
+from ..auth import CachedUser, verify_password_async, create_access_token
 from pathlib import Path
 
+settings = get_settings()
+
 # Use package-relative templates directory
 templates_dir = Path(__file__).resolve().parents[1] / "templates"
 templates = Jinja2Templates(directory=str(templates_dir))
+# Persist compiled templates to disk so fresh workers (restarts, Gunicorn
+# recycles) load bytecode instead of re-parsing each template, and skip the
+# mtime stat on every render — templates only change with a deploy.
+# FileSystemBytecodeCache only auto-creates its default tmp directory, so
+# an explicit one must exist before the first dump_bytecode.
+_bytecode_cache_dir = "/tmp/jinja_cache"
+os.makedirs(_bytecode_cache_dir, exist_ok=True)
+templates.env.bytecode_cache = FileSystemBytecodeCache(directory=_bytecode_cache_dir)
+templates.env.auto_reload = False
+# Status -> badge classes as a Jinja global: one dict lookup per rendered
+# status instead of template-side branching.
+STATUS_CLASS = {
+    "registered": "bg-green-100 text-green-800",
+    "active": "bg-blue-100 text-blue-800",
+    "expired": "bg-red-100 text-red-800",
+    "claimed": "bg-purple-100 text-purple-800",
+}
+templates.env.globals["STATUS_CLASS"] = STATUS_CLASS
 from ..auth import validate_api_key_value
 
 router = APIRouter(prefix="/web", tags=["web"])
 
-# Simple session storage (in production, use Redis or database)
-sessions = {}
 
+@dataclass(slots=True)
+class TemplateContext:
+    """Base for per-template context objects.
+
+    Slotted fixed-shape instances replace the ad-hoc dict each handler
+    built per render; the mapping methods below are the minimal surface
+    TemplateResponse and Jinja's dict() coercion actually touch.
+    """
+
+    request: Request
+
+    def keys(self):
+        return [f.name for f in fields(self)]
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        # TemplateResponse.__call__ reads the context through get(), so
+        # this is load-bearing for every render, not a convenience.
+        return self[key] if key in self else default
+
+    def setdefault(self, key, default=None):
+        return self[key] if key in self else default
+
+
+@dataclass(slots=True)
+class LoginContext(TemplateContext):
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class DashboardContext(TemplateContext):
+    user: CachedUser = None
+    warranties: list = None
+    page: int = 1
+    total_pages: int = 1
+    total: int = 0
+
+
+@dataclass(slots=True)
+class WarrantyDetailContext(TemplateContext):
+    user: CachedUser = None
+    warranty: models.Warranty = None
+
+
+@dataclass(slots=True)
+class WarrantyStatusContext(TemplateContext):
+    user: CachedUser = None
+    warranty: models.Warranty = None
+    message: Optional[str] = None
+    success: bool = False
 
-def get_session_user(request: Request, db: Session = Depends(get_db)) -> Optional[models.User]:
-    """Get user from session cookie."""
+
+@dataclass(slots=True)
+class CheckAssetContext(TemplateContext):
+    user: CachedUser = None
+    warranty: models.Warranty = None
+    message: Optional[str] = None
+    error: Optional[str] = None
+    found: bool = False
+    asset_id: Optional[str] = None
+
+# Status strings resolved to enum members once at import; the update
+# handler validates and coerces with a single dict lookup per request.
+_STATUS_MAP = {s.value: s for s in models.WarrantyStatus}
+
+# Built once at import: the detail and status handlers all fetch a warranty
+# by primary key, so they share a single pre-constructed statement instead
+# of rebuilding the same select per request.
+WARRANTY_BY_ID = (
+    select(models.Warranty)
+    .options(raiseload("*"))
+    .where(models.Warranty.id == bindparam("warranty_id"))
+)
+
+# Sessions live in the shared Redis client (app.cache): shared across
+# workers, and entries expire with the cookie instead of accumulating in
+# process memory forever.
+SESSION_TTL = 3600  # seconds; keep in sync with the cookie max_age
+USER_CACHE_TTL = 60  # seconds; bounds how long a deactivated user keeps browsing
+
+
+# Every unauthenticated hit bounces to the same place; share one prebuilt
+# header dict instead of constructing a fresh RedirectResponse each time
+# (Response copies the mapping, so reuse is safe).
+_LOGIN_REDIRECT_HEADERS = {"location": "/web/login"}
+
+
+def login_redirect() -> Response:
+    """303 redirect to the login page."""
+    return Response(status_code=303, headers=_LOGIN_REDIRECT_HEADERS)
+
+
+async def get_session_user(request: Request, db: AsyncSession) -> Optional[CachedUser]:
+    """Get user from session cookie.
+
+    Every web route runs this, so the resolved user is cached in Redis for
+    a short TTL — cache hits skip the per-click User SELECT entirely.
+    """
     session_id = request.cookies.get("session_id")
-    if not session_id or session_id not in sessions:
+    if not session_id:
         return None
-    
-    user_email = sessions[session_id]
-    user = db.query(models.User).filter(models.User.email == user_email).first()
-    return user
+
+    cached = await redis_client.get(f"sess:{session_id}:user")
+    if cached:
+        data = json.loads(cached)
+        return CachedUser(
+            id=uuid.UUID(data["id"]),
+            email=data["email"],
+            full_name=data["full_name"],
+            is_active=data["is_active"],
+            is_admin=data["is_admin"],
+            created_at=datetime.fromisoformat(data["created_at"]) if data["created_at"] else None,
+        )
+
+    user_email = await redis_client.get(f"sess:{session_id}")
+    if not user_email:
+        return None
+
+    user = (
+        await db.scalars(select(models.User).where(models.User.email == user_email))
+    ).first()
+    if user is None:
+        return None
+
+    await redis_client.setex(
+        f"sess:{session_id}:user",
+        USER_CACHE_TTL,
+        json.dumps({
+            "id": str(user.id),
+            "email": user.email,
+            "full_name": user.full_name,
+            "is_active": user.is_active,
+            "is_admin": user.is_admin,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+        }),
+    )
+    return CachedUser(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        is_active=user.is_active,
+        is_admin=user.is_admin,
+        created_at=user.created_at,
+    )
 
 
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request, error: Optional[str] = None):
     """Render login page."""
-    return templates.TemplateResponse("login.html", {"request": request, "error": error})
+    return templates.TemplateResponse("login.html", LoginContext(request, error=error))
 
 
 @router.post("/login")
@@ -47,21 +222,23 @@ async def login_submit(
     request: Request,
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle login form submission."""
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = (
+        await db.scalars(select(models.User).where(models.User.email == email))
+    ).first()
     
-    if not user or not verify_password(password, user.hashed_password):
-        return templates.TemplateResponse("login.html", {"request": request, "error": "Invalid email or password"}, status_code=401)
+    if not user or not await verify_password_async(password, user.hashed_password):
+        return templates.TemplateResponse("login.html", LoginContext(request, error="Invalid email or password"), status_code=401)
     
-    if user.is_active != 'Y':
-        return templates.TemplateResponse("login.html", {"request": request, "error": "Account is inactive"}, status_code=403)
+    if not user.is_active:
+        return templates.TemplateResponse("login.html", LoginContext(request, error="Account is inactive"), status_code=403)
     
     # Create session
     import secrets
     session_id = secrets.token_urlsafe(32)
-    sessions[session_id] = user.email
+    await redis_client.setex(f"sess:{session_id}", SESSION_TTL, user.email)
     
     response = RedirectResponse(url="/web/dashboard", status_code=303)
     response.set_cookie(
@@ -78,8 +255,8 @@ async def login_submit(
 async def logout(request: Request):
     """Handle logout."""
     session_id = request.cookies.get("session_id")
-    if session_id and session_id in sessions:
-        del sessions[session_id]
+    if session_id:
+        await redis_client.delete(f"sess:{session_id}", f"sess:{session_id}:user")
     
     response = RedirectResponse(url="/web/login", status_code=303)
     response.delete_cookie("session_id")
@@ -90,87 +267,135 @@ async def logout(request: Request):
 async def dashboard(
     request: Request,
     page: int = 1,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Render dashboard with warranty list."""
-    user = get_session_user(request, db)
+    user = await get_session_user(request, db)
     
     if not user:
-        return RedirectResponse(url="/web/login", status_code=303)
-    
-    # Get warranties with pagination
+        return login_redirect()
+
+    # Serve a recently rendered page straight from Redis; the short TTL
+    # keeps repeated refreshes and back-and-forth pagination off Postgres.
+    cache_key = await dashboard_cache_key(user.id, page)
+    cached_html = await redis_client.get(cache_key)
+    if cached_html is not None:
+        return HTMLResponse(cached_html)
+
+    # Get warranties with pagination: one windowed query returns the page
+    # rows and the total count together, instead of a COUNT(*) plus a
+    # second fetch per request. Only the columns the template renders are
+    # selected — the rows stay plain named tuples, skipping ORM hydration
+    # (and any relationship loading) for the 20 rows per render.
     page_size = 20
-    query = db.query(models.Warranty)
-    total = query.count()
-    total_pages = math.ceil(total / page_size) if total > 0 else 1
     offset = (page - 1) * page_size
+
+    result = await db.execute(
+        select(
+            models.Warranty.id,
+            models.Warranty.asset_name,
+            models.Warranty.warranty_status,
+            models.Warranty.registered_at,
+            models.Warranty.registered_by_email,
+            func.count().over().label("total"),
+        )
+        .order_by(models.Warranty.registered_at.desc())
+        .offset(offset)
+        .limit(page_size)
+    )
+    rows = result.all()
+
+    warranties = rows
+    total = rows[0].total if rows else 0
+    total_pages = (total + page_size - 1) // page_size if total else 1
     
-    warranties = query.order_by(
-        models.Warranty.registered_at.desc()
-    ).offset(offset).limit(page_size).all()
-    
-    return templates.TemplateResponse(
-        "dashboard.html",
-        {
-            "request": request,
-            "user": user,
-            "warranties": warranties,
-            "page": page,
-            "total_pages": total_pages,
-            "total": total,
-        },
+    template = templates.get_template("dashboard.html")
+    context = DashboardContext(
+        request,
+        user=user,
+        warranties=warranties,
+        page=page,
+        total_pages=total_pages,
+        total=total,
     )
 
+    async def stream_and_cache():
+        # Stream the render so the header bytes reach the browser while
+        # table rows are still being generated, accumulating the chunks to
+        # populate the page cache once the full document has been sent.
+        chunks = []
+        stream = template.stream(context)
+        stream.enable_buffering(5)  # mutates in place; returns None
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        await redis_client.setex(cache_key, DASHBOARD_CACHE_TTL, "".join(chunks))
+
+    return StreamingResponse(stream_and_cache(), media_type="text/html")
+
 
 @router.get("/", response_class=HTMLResponse)
-async def web_root(request: Request, db: Session = Depends(get_db)):
+async def web_root(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Redirect to dashboard or login."""
-    user = get_session_user(request, db)
+    user = await get_session_user(request, db)
     if user:
         return RedirectResponse(url="/web/dashboard", status_code=303)
-    return RedirectResponse(url="/web/login", status_code=303)
+    return login_redirect()
 
 
 @router.get("/warranty/{warranty_id}", response_class=HTMLResponse)
 async def warranty_detail(
     request: Request,
     warranty_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """View warranty details by warranty ID."""
-    user = get_session_user(request, db)
+    user = await get_session_user(request, db)
     if not user:
-        return RedirectResponse(url="/web/login", status_code=303)
+        return login_redirect()
     
-    warranty = db.query(models.Warranty).filter(
-        models.Warranty.id == warranty_id
-    ).first()
+    warranty = (await db.scalars(WARRANTY_BY_ID, {"warranty_id": warranty_id})).first()
     
     if not warranty:
         return RedirectResponse(url="/web/dashboard", status_code=303)
-    
-    return templates.TemplateResponse("warranty_detail.html", {"request": request, "user": user, "warranty": warranty})
+
+    # Validator-based caching: the page only changes when the row does, so
+    # an ETag from updated_at lets repeat views revalidate with a 304 and
+    # skip the template render. no-cache (not no-store) means the browser
+    # must revalidate but may reuse the stored body on a match.
+    etag = f'W/"{warranty.updated_at.isoformat()}"' if warranty.updated_at else None
+    headers = {"Cache-Control": "private, no-cache"}
+    if etag:
+        headers["ETag"] = etag
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+    return templates.TemplateResponse(
+        "warranty_detail.html",
+        WarrantyDetailContext(request, user=user, warranty=warranty),
+        headers=headers,
+    )
 
 
 @router.get("/warranty/{warranty_id}/status", response_class=HTMLResponse)
 async def warranty_status_page(
     request: Request,
     warranty_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Show update status form."""
-    user = get_session_user(request, db)
+    user = await get_session_user(request, db)
     if not user:
-        return RedirectResponse(url="/web/login", status_code=303)
+        return login_redirect()
     
-    warranty = db.query(models.Warranty).filter(
-        models.Warranty.id == warranty_id
-    ).first()
+    warranty = (await db.scalars(WARRANTY_BY_ID, {"warranty_id": warranty_id})).first()
     
     if not warranty:
         return RedirectResponse(url="/web/dashboard", status_code=303)
     
-    return templates.TemplateResponse("warranty_status.html", {"request": request, "user": user, "warranty": warranty, "message": None, "success": False})
+    return templates.TemplateResponse(
+        "warranty_status.html", WarrantyStatusContext(request, user=user, warranty=warranty)
+    )
 
 
 @router.post("/warranty/{warranty_id}/status", response_class=HTMLResponse)
@@ -178,84 +403,107 @@ async def warranty_status_update(
     request: Request,
     warranty_id: str,
     new_status: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update warranty status."""
-    user = get_session_user(request, db)
+    user = await get_session_user(request, db)
     if not user:
-        return RedirectResponse(url="/web/login", status_code=303)
+        return login_redirect()
     
-    warranty = db.query(models.Warranty).filter(
-        models.Warranty.id == warranty_id
-    ).first()
+    warranty = (await db.scalars(WARRANTY_BY_ID, {"warranty_id": warranty_id})).first()
     
     if not warranty:
         return RedirectResponse(url="/web/dashboard", status_code=303)
     
-    # Validate status
-    valid_statuses = ['registered', 'active', 'expired', 'claimed']
-    if new_status not in valid_statuses:
+    # Validate and coerce in one lookup
+    status_enum = _STATUS_MAP.get(new_status)
+    if status_enum is None:
         return templates.TemplateResponse(
             "warranty_status.html",
-            {"request": request, "user": user, "warranty": warranty, "message": f"Invalid status: {new_status}", "success": False},
+            WarrantyStatusContext(request, user=user, warranty=warranty, message=f"Invalid status: {new_status}"),
         )
     
-    # Update status
-    warranty.warranty_status = models.WarrantyStatus(new_status)
-    db.commit()
-    db.refresh(warranty)
+    # Update status. No refresh afterwards: the confirmation page only
+    # renders values already on the instance, so re-SELECTing the row we
+    # just wrote would be a wasted round-trip.
+    warranty.warranty_status = status_enum
+    await db.commit()
+    await invalidate_dashboard_cache()
     
     return templates.TemplateResponse(
         "warranty_status.html",
-        {"request": request, "user": user, "warranty": warranty, "message": f"Status updated to '{new_status}' successfully!", "success": True},
+        WarrantyStatusContext(
+            request, user=user, warranty=warranty,
+            message=f"Status updated to '{new_status}' successfully!", success=True,
+        ),
     )
 
 
 @router.get("/check-asset", response_class=HTMLResponse)
 async def check_asset_page(
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Show check asset form."""
-    user = get_session_user(request, db)
+    user = await get_session_user(request, db)
     if not user:
-        return RedirectResponse(url="/web/login", status_code=303)
+        return login_redirect()
     
     return templates.TemplateResponse(
-        "check_asset.html",
-        {"request": request, "user": user, "warranty": None, "message": None, "error": None, "found": False, "asset_id": None},
+        "check_asset.html", CheckAssetContext(request, user=user)
     )
 
 
+async def valid_api_key(api_key: str = Form(...)) -> bool:
+    """Validate the API key form field before the handler body runs.
+
+    Declared async so FastAPI resolves it inline on the event loop — a
+    sync dependency would take a threadpool round-trip for what is a
+    single constant-time compare.
+    """
+    return validate_api_key_value(api_key)
+
+
 @router.post("/check-asset", response_class=HTMLResponse)
 async def check_asset_submit(
     request: Request,
     asset_id: str = Form(...),
-    api_key: str = Form(...),
-    db: Session = Depends(get_db)
+    api_key_valid: bool = Depends(valid_api_key),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check warranty by asset ID (requires API key)."""
-    user = get_session_user(request, db)
+    user = await get_session_user(request, db)
     if not user:
-        return RedirectResponse(url="/web/login", status_code=303)
+        return login_redirect()
     
-    # Validate API key
-    if not validate_api_key_value(api_key):
+    if not api_key_valid:
         return templates.TemplateResponse(
             "check_asset.html",
-            {"request": request, "user": user, "warranty": None, "message": None, "error": "Invalid API key", "found": False, "asset_id": asset_id},
+            CheckAssetContext(request, user=user, error="Invalid API key", asset_id=asset_id),
         )
 
     # Check for warranty
-    warranty = db.query(models.Warranty).filter(models.Warranty.asset_id == asset_id).first()
+    warranty = (
+        await db.scalars(
+            select(models.Warranty)
+            .options(raiseload("*"))
+            .where(models.Warranty.asset_id == asset_id)
+        )
+    ).first()
 
     if warranty:
         return templates.TemplateResponse(
             "check_asset.html",
-            {"request": request, "user": user, "warranty": warranty, "message": "Warranty found for this asset!", "error": None, "found": True, "asset_id": asset_id},
+            CheckAssetContext(
+                request, user=user, warranty=warranty,
+                message="Warranty found for this asset!", found=True, asset_id=asset_id,
+            ),
         )
 
     return templates.TemplateResponse(
         "check_asset.html",
-        {"request": request, "user": user, "warranty": None, "message": "No warranty registered for this asset.", "error": None, "found": False, "asset_id": asset_id},
+        CheckAssetContext(
+            request, user=user,
+            message="No warranty registered for this asset.", asset_id=asset_id,
+        ),
     )
@@ -38,8 +38,8 @@ class UserLogin(BaseModel):
 class UserResponse(UserBase):
     """Schema for user responses."""
     id: UUID
-    is_active: str
-    is_admin: str
+    is_active: bool
+    is_admin: bool
     created_at: datetime
     
     class Config:
@@ -90,12 +90,20 @@ class WarrantyResponse(BaseModel):
 
 
 class WarrantyListResponse(BaseModel):
-    """Schema for listing warranties with pagination."""
+    """Schema for listing warranties with pagination.
+
+    Clients should page with `next_cursor` plus `next_cursor_id` (keyset
+    pagination); `total` and `total_pages` are only populated on the first
+    page of offset requests.
+    """
     warranties: List[WarrantyResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    has_more: bool = False
+    next_cursor: Optional[datetime] = None
+    next_cursor_id: Optional[UUID] = None
 
 
 class WarrantyRegistrationResult(BaseModel):
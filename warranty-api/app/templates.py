@@ -1,11 +0,0 @@
-"""
-Placeholder module: templates have been moved to `app/templates/*.html`.
-
-Keep this module minimal so other modules that import it (during a transitional period)
-don't fail. Remove imports of this module in production code and use
-`fastapi.templating.Jinja2Templates(directory=...)` instead.
-"""
-
-__all__ = ["DEPRECATED_PLACEHOLDER"]
-
-DEPRECATED_PLACEHOLDER = True
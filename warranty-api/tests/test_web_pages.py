@@ -0,0 +1,28 @@
+"""
+Regression tests for the web interface rendering path.
+
+Instantiating a TemplateResponse only runs the Jinja render; starlette
+reads the context as a mapping again inside the response __call__, so
+these tests render a page through the full ASGI app to cover that path
+(the dataclass contexts once shipped without get() and broke it).
+"""
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+# No `with` block: the lifespan (DB/user bootstrap) is deliberately
+# skipped, and the login page touches neither Postgres nor Redis.
+client = TestClient(app)
+
+
+def test_login_page_renders():
+    response = client.get("/web/login")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert "<form" in response.text
+
+
+def test_login_page_renders_error_message():
+    response = client.get("/web/login", params={"error": "Invalid email or password"})
+    assert response.status_code == 200
+    assert "Invalid email or password" in response.text